@@ -10,17 +10,28 @@ from flask import (
 	stream_with_context,
 	has_request_context,
 )
-import subprocess
 import os
+import copy
 import logging
+import sys
+import io
+import traceback
 import threading
-import queue
+import collections
+import functools
 import json
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
 from datetime import datetime
 from zoneinfo import ZoneInfo
 import base64
 import re
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import shutil
 import zipfile
 import uuid
@@ -29,6 +40,7 @@ from restore import run_restore, run_restore_streamed
 from io import BytesIO
 from generate_html import add_jellytag_bypass as generate_add_jellytag_bypass
 from generate_html import check_low_res
+from generate_html import main as generate_html_main
 import fresh_state
 from fresh_jellyfin import (
 	DEFAULT_SELECTED_IMAGES,
@@ -56,6 +68,15 @@ AUTO_FILE = "data/auto_jobs.json"
 KEEP_FILE = "data/keep.json"  # ✅ NEW: Keep/Dont-Keep storage
 
 app = Flask(__name__, template_folder="templates")
+# Templates only change with the image: skip the per-render stat() Jinja
+# does to check for on-disk edits, so each template compiles exactly once.
+app.config["TEMPLATES_AUTO_RELOAD"] = False
+app.jinja_env.auto_reload = False
+# Opt-in for deployments fronted by a proxy that understands X-Sendfile
+# (e.g. nginx/Apache): the kernel then streams large ZIPs/HTML instead of
+# pushing every chunk through Python.
+if os.environ.get("PIXELFIN_X_SENDFILE", "").lower() in ("1", "true", "yes"):
+	app.use_x_sendfile = True
 BASE_OUTPUT_DIR = "output"
 ASSETS_DIR = "assets"
 FRESH_COVER_CACHE_DIR = os.path.join("data", "fresh_cover_cache")
@@ -99,6 +120,36 @@ DEFAULT_ZIP_BASENAMES = {
 	"m": "menu",
 }
 
+_ALL_IMAGE_CODES = tuple(IMAGE_TYPE_OPTIONS)
+
+# Form field names for the per-image-type inputs, prebuilt so POST parsing
+# doesn't re-allocate the same f-strings on every submit.
+_MINRES_KEYS = tuple((code, f"minres_{code}_w", f"minres_{code}_h") for code in IMAGE_TYPE_OPTIONS)
+_ZIPNAME_KEYS = tuple((code, f"zipname_{code}") for code in IMAGE_TYPE_OPTIONS)
+
+
+# ----------------- JSON codec helpers -----------------
+# orjson (C-implemented) parses/serializes several times faster than stdlib
+# json; fall back to stdlib when it isn't installed.
+if orjson is not None:
+	def _json_loads(raw):
+		return orjson.loads(raw)
+
+	def _json_dumps(obj) -> bytes:
+		return orjson.dumps(obj)
+
+	def _json_dump_arg(obj) -> str:
+		return orjson.dumps(obj).decode("utf-8")
+else:
+	def _json_loads(raw):
+		return json.loads(raw)
+
+	def _json_dumps(obj) -> bytes:
+		return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+	def _json_dump_arg(obj) -> str:
+		return json.dumps(obj)
+
 
 # ----------------- Custom Jinja Filters -----------------
 @app.template_filter("basename")
@@ -108,16 +159,9 @@ def basename_filter(path):
 	return os.path.basename(path)
 
 
-def load_pixelfin_base64(filename):
-	path = os.path.join(ASSETS_DIR, filename)
-	if os.path.exists(path):
-		with open(path, "rb") as f:
-			return base64.b64encode(f.read()).decode("utf-8")
-	return ""
-
-
-PIXELFIN_BASE64 = load_pixelfin_base64("Pixelfin.png")
-PIXELFIN_FAVICON_BASE64 = load_pixelfin_base64("Pixelfin_Favicon.png")
+# Pages reference the favicon/logo as /assets URLs (served immutable-cached
+# below) instead of inlining the base64 payloads into every response.
+_FAVICON_LINK = "<link rel='icon' type='image/png' href='/assets/Pixelfin_Favicon.png' />"
 
 
 # ----------------- Keep Helpers (NEW) -----------------
@@ -195,29 +239,60 @@ def get_kept_filenames_for_library(library_folder: str) -> set:
 
 
 # ----------------- History Helpers -----------------
-def load_history():
-	# Ensure file exists and is a file, not a folder
-	if os.path.exists(HISTORY_FILE) and os.path.isdir(HISTORY_FILE):
-		shutil.rmtree(HISTORY_FILE)
-		with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-			f.write("{}")
+# Parsed history is cached in-memory and invalidated on the file's mtime so we
+# only pay the open+json.load cost when history.json actually changes (it is
+# read several times per request).
+_HISTORY_CACHE = {"key": None, "data": None}
+_HISTORY_CACHE_LOCK = threading.Lock()
 
+
+def _init_history_file():
+	# Ensure file exists and is a file, not a folder. Runs once at import so
+	# the per-call path doesn't pay exists/isdir stats on every load.
+	if os.path.isdir(HISTORY_FILE):
+		shutil.rmtree(HISTORY_FILE)
 	if not os.path.exists(HISTORY_FILE):
 		with open(HISTORY_FILE, "w", encoding="utf-8") as f:
 			f.write("{}")
 
-	with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-		try:
-			data = json.load(f)
-			if not isinstance(data, dict):
-				raise ValueError("history is not a dict")
-		except Exception:
-			data = {"servers": [], "libraries": [], "library_settings": {}, "last_used": {}}
+
+_init_history_file()
+
+
+def _history_file_key():
+	# mtime alone can miss same-second rewrites; pairing it with the size
+	# makes the staleness check effectively collision-free.
+	try:
+		st = os.stat(HISTORY_FILE)
+		return (st.st_mtime_ns, st.st_size)
+	except OSError:
+		return None
+
+
+def load_history():
+	key = _history_file_key()
+
+	with _HISTORY_CACHE_LOCK:
+		if key is not None and key == _HISTORY_CACHE["key"]:
+			# Deep-copy so callers can mutate their view without corrupting the cache.
+			return copy.deepcopy(_HISTORY_CACHE["data"])
+
+	try:
+		with open(HISTORY_FILE, "rb") as f:
+			data = _json_loads(f.read())
+		if not isinstance(data, dict):
+			raise ValueError("history is not a dict")
+	except Exception:
+		data = {"servers": [], "libraries": [], "library_settings": {}, "last_used": {}}
 
 	data.setdefault("servers", [])
 	data.setdefault("libraries", [])
 	data.setdefault("library_settings", {})
 	data.setdefault("last_used", {})
+
+	with _HISTORY_CACHE_LOCK:
+		_HISTORY_CACHE["key"] = key
+		_HISTORY_CACHE["data"] = copy.deepcopy(data)
 	return data
 
 
@@ -236,7 +311,7 @@ def save_history(server, library, settings):
 	history["last_used"] = {
 		"server": server,
 		"apikey": settings.get("apikey", ""),
-		"images": settings.get("images", list(IMAGE_TYPE_OPTIONS.keys())),
+		"images": settings.get("images", list(_ALL_IMAGE_CODES)),
 		"minres": settings.get("minres", {}),
 		"zipnames": settings.get("zipnames", {}),
 		"bgcolor": settings.get("bgcolor", "#000000"),
@@ -246,8 +321,19 @@ def save_history(server, library, settings):
 		"jellytag_bypass": bool(settings.get("jellytag_bypass", False)),
 	}
 
-	with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-		json.dump(history, f, indent=2)
+	# Atomic write: a crash mid-write leaves the old history intact instead
+	# of a truncated file.
+	tmp = HISTORY_FILE + ".tmp"
+	with open(tmp, "wb") as f:
+		f.write(_json_dumps(history))
+	os.replace(tmp, HISTORY_FILE)
+
+	# Refresh the cache in place so the next load_history() skips the re-read.
+	# Round-trip through the codec so cached reads match an on-disk parse
+	# (e.g. tuples become lists).
+	with _HISTORY_CACHE_LOCK:
+		_HISTORY_CACHE["key"] = _history_file_key()
+		_HISTORY_CACHE["data"] = _json_loads(_json_dumps(history))
 
 
 # ----------------- Auto Jobs Helpers -----------------
@@ -292,7 +378,7 @@ def load_auto():
 			"keep_html": int(j.get("keep_html", 2) or 0),
 			"auto_zip": bool(j.get("auto_zip", False)),
 			"keep_zip": int(j.get("keep_zip", 2) or 0),
-			"images": j.get("images") or list(IMAGE_TYPE_OPTIONS.keys()),
+			"images": j.get("images") or list(_ALL_IMAGE_CODES),
 			"minres": j.get("minres") or {},
 			"zipnames": j.get("zipnames") or {},
 			"sort_order": (j.get("sort_order") or "alphabetical").strip() or "alphabetical",
@@ -374,25 +460,105 @@ def _mark_interrupted_fresh_auto_scan():
 
 
 # ----------------- Output listing helpers -----------------
+# The landing page re-walked the whole output tree (plus history/keep reads)
+# on every GET. Cache the listing keyed on the mtimes of everything it
+# depends on: the output root, each library folder, and the history/keep
+# files. Any write to those bumps an mtime and invalidates naturally.
+_OUTPUT_LIST_CACHE = {"key": None, "val": None, "per_lib": {}}
+_OUTPUT_LIST_LOCK = threading.Lock()
+_OUTPUT_FILE_EXTS = (".html", ".zip")
+
+
+def _output_listing_key():
+	try:
+		root_mtime = os.stat(BASE_OUTPUT_DIR).st_mtime_ns
+		folders = []
+		with os.scandir(BASE_OUTPUT_DIR) as it:
+			for entry in it:
+				if entry.is_dir(follow_symlinks=False):
+					folders.append((entry.name, entry.stat().st_mtime_ns))
+	except OSError:
+		return None
+	folders.sort()
+	extra = []
+	for path in (HISTORY_FILE, KEEP_FILE):
+		try:
+			extra.append(os.stat(path).st_mtime_ns)
+		except OSError:
+			extra.append(-1)
+	return (root_mtime, tuple(folders), tuple(extra))
+
+
 def list_generated_htmls():
 	"""
 	Returns:
 	  { display_library_name: [ {filename, name, path, folder, is_kept}, ... ] }
+
+	The returned dict is cached and shared between requests — treat it as
+	read-only.
 	"""
+	key = _output_listing_key()
+	with _OUTPUT_LIST_LOCK:
+		if key is not None and key == _OUTPUT_LIST_CACHE["key"]:
+			return _OUTPUT_LIST_CACHE["val"]
+
 	result = {}
 	history = load_history()
-	if not os.path.exists(BASE_OUTPUT_DIR):
-		return result
 
-	for folder in sorted(os.listdir(BASE_OUTPUT_DIR)):
-		lib_folder = os.path.join(BASE_OUTPUT_DIR, folder)
-		if not os.path.isdir(lib_folder):
-			continue
+	# The key stat pass already enumerated the library folders; reuse it so
+	# a rebuild doesn't rescan the output root a second time.
+	if key is not None:
+		folder_mtimes = dict(key[1])
+		subdirs = sorted(
+			(name, os.path.join(BASE_OUTPUT_DIR, name))
+			for name in folder_mtimes
+			if not name.startswith(".")
+		)
+	else:
+		folder_mtimes = {}
+		try:
+			with os.scandir(BASE_OUTPUT_DIR) as it:
+				subdirs = sorted(
+					(e.name, e.path)
+					for e in it
+					if not e.name.startswith(".") and e.is_dir(follow_symlinks=False)
+				)
+		except OSError:
+			return result
+
+	# Folder-name -> display-name lookup built once instead of scanning the
+	# library list (with its .replace() allocations) per folder.
+	alias = {}
+	for lib in history.get("libraries", []):
+		alias.setdefault(_safe_library_folder(lib), lib)
+		alias.setdefault(lib.replace(" ", ""), lib)
+
+	# Only re-scan folders whose own mtime moved; unchanged libraries reuse
+	# their cached name list (a history/keep edit then costs zero getdents).
+	with _OUTPUT_LIST_LOCK:
+		per_lib = _OUTPUT_LIST_CACHE["per_lib"]
+	new_per_lib = {}
+	names_by_folder = {}
+	for folder, folder_path in subdirs:
+		mtime = folder_mtimes.get(folder)
+		cached = per_lib.get(folder)
+		if cached is not None and mtime is not None and cached[0] == mtime:
+			names = cached[1]
+		else:
+			try:
+				with os.scandir(folder_path) as it:
+					names = sorted(
+						(e.name for e in it if not e.name.startswith(".")), reverse=True
+					)
+			except OSError:
+				names = []
+		names_by_folder[folder] = names
+		new_per_lib[folder] = (mtime, names)
 
+	for folder, _ in subdirs:
 		files = []
-		for f in sorted(os.listdir(lib_folder), reverse=True):
-			lower_f = f.lower()
-			if lower_f.endswith(".html") or lower_f.endswith(".zip"):
+		for f in names_by_folder[folder]:
+			if f.lower().endswith(_OUTPUT_FILE_EXTS):
 				files.append(
 					{
 						"filename": f,
@@ -404,21 +570,13 @@ def list_generated_htmls():
 				)
 
 		if files:
-			display_name = next(
-				(lib for lib in history.get("libraries", []) if _safe_library_folder(lib) == folder or lib.replace(" ", "") == folder),
-				folder,
-			)
-			result[display_name] = files
+			result[alias.get(folder, folder)] = files
 
 	# include restore htmls if present
-	for folder in sorted(os.listdir(BASE_OUTPUT_DIR)):
-		lib_folder = os.path.join(BASE_OUTPUT_DIR, folder)
-		if not os.path.isdir(lib_folder):
-			continue
-
+	for folder, _ in subdirs:
 		restore_htmls = [
 			f
-			for f in sorted(os.listdir(lib_folder), reverse=True)
+			for f in names_by_folder[folder]
 			if f.lower().startswith("restore-") and f.lower().endswith(".html")
 		]
 		if restore_htmls:
@@ -434,6 +592,11 @@ def list_generated_htmls():
 			]
 			result[folder] = result.get(folder, []) + files
 
+	with _OUTPUT_LIST_LOCK:
+		_OUTPUT_LIST_CACHE["key"] = key
+		_OUTPUT_LIST_CACHE["val"] = result
+		_OUTPUT_LIST_CACHE["per_lib"] = new_per_lib
+
 	return result
 
 
@@ -472,36 +635,165 @@ def list_zip_files():
 	return [e[3] for e in entries]
 
 
+@functools.lru_cache(maxsize=4)
+def _tz(tzname):
+	# ZoneInfo() re-reads the tzdata file on every construction; cache per name.
+	return ZoneInfo(tzname)
+
+
 def now_in_tz():
 	tzname = os.environ.get("PIXELFIN_TIMEZONE") or os.environ.get("TIMEZONE") or os.environ.get("TZ")
 	try:
 		if tzname:
-			return datetime.now(ZoneInfo(tzname))
+			return datetime.now(_tz(tzname))
 		return datetime.now().astimezone()
 	except Exception:
 		return datetime.now()
 
 
+# Everything after the <title> is constant — build it once at import.
+_STREAM_PAGE_PROLOGUE = (
+	_FAVICON_LINK
+	+ "<style>"
+	"body{margin:0;padding:18px;background:#fff;color:#111;font-family:system-ui,-apple-system,Segoe UI,Roboto,sans-serif;}"
+	"pre{overflow:auto;max-height:520px;background:#0b0b0b;color:#0f0;padding:14px;border-radius:10px;border:1px solid #333;}"
+	".actions{margin-top:14px;display:flex;gap:10px;flex-wrap:wrap;align-items:center;}"
+	".btn{display:inline-block;padding:10px 14px;border-radius:10px;border:1px solid #ccc;background:#f5f5f5;color:#111;text-decoration:none;}"
+	".btn:hover{background:#eee;}"
+	".muted{color:#666;font-size:12px;margin-top:10px;}"
+	"</style></head><body>"
+	"<pre id='log'>\n"
+)
+
+
 def _stream_page_open(title: str):
-	return (
-		f"<html><head><title>{title}</title>"
-		f"<link rel='icon' type='image/png' href='data:image/png;base64,{PIXELFIN_FAVICON_BASE64}' />"
-		"<style>"
-		"body{margin:0;padding:18px;background:#fff;color:#111;font-family:system-ui,-apple-system,Segoe UI,Roboto,sans-serif;}"
-		"pre{overflow:auto;max-height:520px;background:#0b0b0b;color:#0f0;padding:14px;border-radius:10px;border:1px solid #333;}"
-		".actions{margin-top:14px;display:flex;gap:10px;flex-wrap:wrap;align-items:center;}"
-		".btn{display:inline-block;padding:10px 14px;border-radius:10px;border:1px solid #ccc;background:#f5f5f5;color:#111;text-decoration:none;}"
-		".btn:hover{background:#eee;}"
-		".muted{color:#666;font-size:12px;margin-top:10px;}"
-		"</style></head><body>"
-		"<pre id='log'>\n"
-	)
+	return f"<html><head><title>{title}</title>" + _STREAM_PAGE_PROLOGUE
 
 
 def _stream_page_close():
 	return "<script>var pre=document.getElementById('log');pre.scrollTop=pre.scrollHeight;</script></body></html>"
 
 
+# ----------------- In-process generator runs -----------------
+# generate_html used to run as a `python generate_html.py` subprocess with
+# its stdout piped back, paying interpreter startup and a full module import
+# per run. It now runs in-process: a thread-local stdout router sends its
+# print() output to the requesting stream without touching other threads,
+# and the shared requests session/resolution cache survive between runs.
+class _LogBuffer:
+	"""
+	Single-producer/single-consumer log channel. deque appends/poplefts are
+	atomic, so unlike queue.Queue there is no Condition round trip per chunk;
+	the Event only gates the (rare) empty-buffer wait. Iteration ends at the
+	None sentinel.
+	"""
+
+	def __init__(self):
+		self._chunks = collections.deque()
+		self._ready = threading.Event()
+
+	def put(self, chunk):
+		self._chunks.append(chunk)
+		self._ready.set()
+
+	def __iter__(self):
+		chunks = self._chunks
+		while True:
+			while chunks:
+				chunk = chunks.popleft()
+				if chunk is None:
+					return
+				yield chunk
+			self._ready.wait(0.2)
+			self._ready.clear()
+
+
+class _LogBufferWriter:
+	"""Adapts a _LogBuffer to the text-stream interface the router expects."""
+
+	def __init__(self, buf):
+		self._buf = buf
+
+	def write(self, s):
+		if s:
+			self._buf.put(s.encode("utf-8"))
+		return len(s)
+
+	def flush(self):
+		pass
+
+
+class _StdoutRouter(io.TextIOBase):
+	"""
+	Installed once as sys.stdout. Threads that run generate_html in-process
+	route their writes to a per-thread target; everything else falls through
+	to the real stdout.
+	"""
+
+	def __init__(self, fallback):
+		self._fallback = fallback
+		self._local = threading.local()
+
+	def route_to(self, target):
+		self._local.target = target
+
+	def unroute(self):
+		self._local.target = None
+
+	def write(self, s):
+		target = getattr(self._local, "target", None)
+		if target is None:
+			return self._fallback.write(s)
+		return target.write(s)
+
+	def flush(self):
+		target = getattr(self._local, "target", None)
+		if target is None:
+			self._fallback.flush()
+		else:
+			target.flush()
+
+
+_STDOUT_ROUTER = _StdoutRouter(sys.stdout)
+sys.stdout = _STDOUT_ROUTER
+
+
+def _call_generate_html(cli_args, writer):
+	"""Run generate_html.main with stdout routed to writer; returns exit status."""
+	_STDOUT_ROUTER.route_to(writer)
+	try:
+		return generate_html_main(cli_args)
+	except SystemExit as e:
+		return int(e.code or 0)
+	except Exception:
+		writer.write(traceback.format_exc())
+		return 1
+	finally:
+		_STDOUT_ROUTER.unroute()
+
+
+def _start_generate_job(cli_args, log_buffer):
+	"""
+	Run generate_html.main(cli_args) on a daemon thread, streaming its output
+	into log_buffer with the usual None-sentinel termination.
+	"""
+	def _worker():
+		writer = _LogBufferWriter(log_buffer)
+		rc = _call_generate_html(cli_args, writer)
+		if rc:
+			writer.write(f"\ngenerate_html exited with status {rc}\n")
+		log_buffer.put(None)
+
+	threading.Thread(target=_worker, daemon=True).start()
+
+
+def _run_generate_inline(cli_args):
+	"""Synchronous in-process run for the AUTO paths; returns (rc, output)."""
+	buf = io.StringIO()
+	rc = _call_generate_html(cli_args, buf)
+	return rc, buf.getvalue()
+
+
 # ----------------- Cron parsing + scheduler -----------------
 _CRON_RANGES = {
 	"min": (0, 59),
@@ -786,8 +1078,6 @@ def _run_generate_html_once(server, apikey, library, bgcolor, textcolor, tablebg
 	output_file = os.path.join(lib_folder, html_filename)
 
 	args = [
-		"python",
-		"generate_html.py",
 		"--server", server,
 		"--apikey", apikey,
 		"--library", library,
@@ -806,11 +1096,11 @@ def _run_generate_html_once(server, apikey, library, bgcolor, textcolor, tablebg
 		args.append("--jellytag-bypass")
 
 	app.logger.info("AUTO: running HTML for library=%s sort=%s", library, sort_order)
-	proc = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+	rc, output = _run_generate_inline(args)
 
-	if proc.returncode != 0:
-		app.logger.error("AUTO: HTML failed for %s\n%s", library, proc.stdout or "")
-	return proc.returncode == 0
+	if rc != 0:
+		app.logger.error("AUTO: HTML failed for %s\n%s", library, output)
+	return rc == 0
 
 
 def _run_generate_zip_once(server, apikey, library, images, zipnames, sort_order, jellytag_bypass=False):
@@ -825,24 +1115,22 @@ def _run_generate_zip_once(server, apikey, library, images, zipnames, sort_order
 	zip_path = os.path.join(lib_folder, zip_filename)
 
 	args = [
-		"python",
-		"generate_html.py",
 		"--server", server,
 		"--apikey", apikey,
 		"--library", library,
 		"--images", ",".join(images),
 		"--zip-output", zip_path,
-		"--zipnames", json.dumps(zipnames or {}),
+		"--zipnames", _json_dump_arg(zipnames or {}),
 		"--sort", sort_order,
 	]
 	if jellytag_bypass:
 		args.append("--jellytag-bypass")
 
 	app.logger.info("AUTO: running ZIP for library=%s sort=%s", library, sort_order)
-	proc = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-	if proc.returncode != 0:
-		app.logger.error("AUTO: ZIP failed for %s\n%s", library, proc.stdout or "")
-	return proc.returncode == 0
+	rc, output = _run_generate_inline(args)
+	if rc != 0:
+		app.logger.error("AUTO: ZIP failed for %s\n%s", library, output)
+	return rc == 0
 
 
 def _set_fresh_zip_status(active, message=""):
@@ -915,7 +1203,7 @@ def _run_auto_sequence():
 			continue
 
 		lib_settings = history.get("library_settings", {}).get(library, {})
-		job_images = job.get("images") or lib_settings.get("images") or last_used.get("images") or list(IMAGE_TYPE_OPTIONS.keys())
+		job_images = job.get("images") or lib_settings.get("images") or last_used.get("images") or list(_ALL_IMAGE_CODES)
 		job_minres = job.get("minres") or lib_settings.get("minres") or {}
 		job_zipnames = job.get("zipnames") or lib_settings.get("zipnames") or {}
 		job_jellytag_bypass = bool(job.get("jellytag_bypass", lib_settings.get("jellytag_bypass", last_used.get("jellytag_bypass", False))))
@@ -2435,7 +2723,6 @@ def fresh_restore_review():
 			dry_run=dry_run,
 			comparison_token="active",
 			completed=False,
-			pixelfin_favicon=PIXELFIN_FAVICON_BASE64,
 			match_options=match_options,
 			selected_restore_types=selected_restore_types,
 		)
@@ -2485,7 +2772,6 @@ def fresh_restore_run():
 			dry_run=False,
 			comparison_token="active",
 			completed=True,
-			pixelfin_favicon=PIXELFIN_FAVICON_BASE64,
 			match_options=_FRESH_RESTORE_CONTEXT.get("match_options") or [],
 			selected_restore_types=set(_FRESH_RESTORE_CONTEXT.get("selected_restore_types") or []) if _FRESH_RESTORE_CONTEXT.get("selected_restore_types") is not None else None,
 		)
@@ -2598,7 +2884,7 @@ def index():
 		"bgcolor": last_used.get("bgcolor", "#000000"),
 		"textcolor": last_used.get("textcolor", "#ffffff"),
 		"tablebgcolor": last_used.get("tablebgcolor", "#000000"),
-		"images": last_used.get("images", list(IMAGE_TYPE_OPTIONS.keys())),
+		"images": last_used.get("images", list(_ALL_IMAGE_CODES)),
 		"apikey": last_used.get("apikey", ""),
 		"minres": last_used.get("minres", {}),
 		"zipnames": last_used.get("zipnames", {}),
@@ -2626,7 +2912,7 @@ def index():
 					"tablebgcolor", lib_settings.get("tablebgcolor", "#000000")
 				),
 				"images": request.form.getlist("images")
-				or lib_settings.get("images", list(IMAGE_TYPE_OPTIONS.keys())),
+				or lib_settings.get("images", list(_ALL_IMAGE_CODES)),
 				"apikey": request.form.get(
 					"apikey", lib_settings.get("apikey", last_used.get("apikey", ""))
 				),
@@ -2654,19 +2940,19 @@ def index():
 
 		# min resolution
 		minres = {}
-		for code in IMAGE_TYPE_OPTIONS:
-			try:
-				w = int(request.form.get(f"minres_{code}_w") or 0)
-				h = int(request.form.get(f"minres_{code}_h") or 0)
+		form_get = request.form.get
+		for code, w_key, h_key in _MINRES_KEYS:
+			w = form_get(w_key)
+			h = form_get(h_key)
+			if w and h and w.isdigit() and h.isdigit():
+				w, h = int(w), int(h)
 				if w > 0 and h > 0:
 					minres[code] = (w, h)
-			except ValueError:
-				continue
 
 		# zip filename overrides
 		zipnames = {}
-		for code in IMAGE_TYPE_OPTIONS:
-			val = (request.form.get(f"zipname_{code}", "") or "").strip()
+		for code, key in _ZIPNAME_KEYS:
+			val = (form_get(key, "") or "").strip()
 			if val:
 				zipnames[code] = val
 
@@ -2696,50 +2982,38 @@ def index():
 		timestamp_file = now.strftime("%Y-%m-%d_%H-%M-%S")
 		timestamp_html = now.strftime("%Y-%m-%d %H:%M:%S")
 
-		log_queue = queue.Queue()
+		log_queue = _LogBuffer()
 
 		# ---------- ZIP ----------
 		if action == "zip":
 			zip_filename = f"{timestamp_file} - {library}.zip"
 			zip_path = os.path.join(lib_folder, zip_filename)
 
-			def run_create_zip():
-				args = [
-					"python",
-					"generate_html.py",
-					"--server",
-					server,
-					"--apikey",
-					apikey,
-					"--library",
-					library,
-					"--images",
-					",".join(selected_images),
-					"--zip-output",
-					zip_path,
-					"--zipnames",
-					json.dumps(zipnames),
-					"--sort",
-					sort_order,
-				]
-				if jellytag_bypass:
-					args.append("--jellytag-bypass")
-				proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-				for line in proc.stdout:
-					log_queue.put(line)
-				proc.wait()
-				log_queue.put(None)
-
-			threading.Thread(target=run_create_zip).start()
+			args = [
+				"--server",
+				server,
+				"--apikey",
+				apikey,
+				"--library",
+				library,
+				"--images",
+				",".join(selected_images),
+				"--zip-output",
+				zip_path,
+				"--zipnames",
+				_json_dump_arg(zipnames),
+				"--sort",
+				sort_order,
+			]
+			if jellytag_bypass:
+				args.append("--jellytag-bypass")
+			_start_generate_job(args, log_queue)
 
 			def generate_zip_stream():
 				yield _stream_page_open("Creating ZIP")
 
-				while True:
-					line = log_queue.get()
-					if line is None:
-						break
-					yield line
+				for chunk in log_queue:
+					yield chunk.decode("utf-8", "replace")
 
 				yield "\n</pre>"
 
@@ -2760,53 +3034,41 @@ def index():
 		html_filename = f"{timestamp_file} - {library} - {sort_suffix}.html"
 		output_file = os.path.join(lib_folder, html_filename)
 
-		def run_generate_html():
-			args = [
-				"python",
-				"generate_html.py",
-				"--server",
-				server,
-				"--apikey",
-				apikey,
-				"--library",
-				library,
-				"--output",
-				output_file,
-				"--bgcolor",
-				bgcolor,
-				"--textcolor",
-				textcolor,
-				"--tablebgcolor",
-				tablebgcolor,
-				"--images",
-				",".join(selected_images),
-				"--timestamp",
-				timestamp_html,
-				"--sort",
-				sort_order,
-			]
-			if jellytag_bypass:
-				args.append("--jellytag-bypass")
-			if minres:
-				minres_str = ";".join([f"{code}:{w}x{h}" for code, (w, h) in minres.items()])
-				args += ["--minres", minres_str]
-
-			proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-			for line in proc.stdout:
-				log_queue.put(line)
-			proc.wait()
-			log_queue.put(None)
+		args = [
+			"--server",
+			server,
+			"--apikey",
+			apikey,
+			"--library",
+			library,
+			"--output",
+			output_file,
+			"--bgcolor",
+			bgcolor,
+			"--textcolor",
+			textcolor,
+			"--tablebgcolor",
+			tablebgcolor,
+			"--images",
+			",".join(selected_images),
+			"--timestamp",
+			timestamp_html,
+			"--sort",
+			sort_order,
+		]
+		if jellytag_bypass:
+			args.append("--jellytag-bypass")
+		if minres:
+			minres_str = ";".join([f"{code}:{w}x{h}" for code, (w, h) in minres.items()])
+			args += ["--minres", minres_str]
 
-		threading.Thread(target=run_generate_html).start()
+		_start_generate_job(args, log_queue)
 
 		def generate_html_stream():
 			yield _stream_page_open("HTML Generated")
 
-			while True:
-				line = log_queue.get()
-				if line is None:
-					break
-				yield line
+			for chunk in log_queue:
+				yield chunk.decode("utf-8", "replace")
 
 			yield "\n</pre>"
 
@@ -2814,25 +3076,6 @@ def index():
 				lib_folder, exts=(".html",), exclude_prefixes=("restore-",)
 			)
 			html_filename_real = newest_html or html_filename
-			output_file_real = os.path.join(lib_folder, html_filename_real)
-
-			# Inject favicon only (avoid duplicate Pixelfin logo; generate_html already shows it)
-			try:
-				if os.path.exists(output_file_real):
-					with open(output_file_real, "r", encoding="utf-8") as f:
-						content = f.read()
-
-					if "data:image/png;base64," not in content and "<link rel='icon'" not in content:
-						content = content.replace(
-							"<head>",
-							f"<head>\n<link rel='icon' type='image/png' href='data:image/png;base64,{PIXELFIN_FAVICON_BASE64}' />",
-							1,
-						)
-						with open(output_file_real, "w", encoding="utf-8") as f:
-							f.write(content)
-			except Exception as e:
-				yield f"<div class='muted'>⚠️ Pixelfin favicon injection failed: {str(e)}</div>"
-
 			view_url = url_for("serve_output", library=safe_library, filename=html_filename_real)
 			download_url = url_for("download_embedded", library=safe_library, filename=html_filename_real)
 
@@ -2852,7 +3095,6 @@ def index():
 		generated=list_generated_htmls(),
 		history=history,
 		selected=selected,
-		pixelfin=PIXELFIN_BASE64,
 		default_zip_basenames=DEFAULT_ZIP_BASENAMES,
 		available_zips=list_zip_files(),  # ✅ now sorted per your rule
 		active_page="main",
@@ -2895,10 +3137,10 @@ def auto_page():
 
 			images = request.form.getlist(f"job_{i}_images")
 			if not images:
-				images = list(IMAGE_TYPE_OPTIONS.keys())
+				images = list(_ALL_IMAGE_CODES)
 
 			minres = {}
-			for code in IMAGE_TYPE_OPTIONS.keys():
+			for code in _ALL_IMAGE_CODES:
 				try:
 					w = int(request.form.get(f"job_{i}_minres_{code}_w") or 0)
 					h = int(request.form.get(f"job_{i}_minres_{code}_h") or 0)
@@ -2908,7 +3150,7 @@ def auto_page():
 					pass
 
 			zipnames = {}
-			for code in IMAGE_TYPE_OPTIONS.keys():
+			for code in _ALL_IMAGE_CODES:
 				val = (request.form.get(f"job_{i}_zipname_{code}") or "").strip()
 				if val:
 					zipnames[code] = val
@@ -2941,7 +3183,6 @@ def auto_page():
 		history=history,
 		image_types=IMAGE_TYPE_OPTIONS,
 		default_zip_basenames=DEFAULT_ZIP_BASENAMES,
-		pixelfin=PIXELFIN_BASE64,
 		auto=auto,
 		active_page="auto",
 	)
@@ -3072,8 +3313,6 @@ def restore_images():
 				apikey=apikey,
 				html_link=html_link,
 				dry_run=dry_run,  # <-- user intent (apply step will respect this)
-				pixelfin_logo=PIXELFIN_BASE64,
-				pixelfin_favicon=PIXELFIN_FAVICON_BASE64,
 				threshold=threshold,
 				zip_path=zip_path,
 			)
@@ -3089,7 +3328,13 @@ def restore_images():
 
 @app.route("/output/<library>/<filename>")
 def serve_output(library, filename):
-	return send_from_directory(os.path.join(BASE_OUTPUT_DIR, library), filename)
+	# conditional=True answers If-Modified-Since/Range requests with 304s and
+	# partial content, so browsers re-downloading a large ZIP resume instead
+	# of pulling the whole file again. A short max-age keeps repeat views of
+	# the same gallery from even revalidating while a build is being eyeballed.
+	return send_from_directory(
+		os.path.join(BASE_OUTPUT_DIR, library), filename, conditional=True, max_age=60
+	)
 
 
 @app.route("/fresh/output/delete-zip", methods=["POST"])
@@ -3135,6 +3380,12 @@ def delete_file(library, filename):
 	if os.path.exists(file_path):
 		os.remove(file_path)
 
+	# drop the cached embedded copy alongside the source
+	try:
+		os.remove(os.path.join(BASE_OUTPUT_DIR, library, ".embedded", filename))
+	except OSError:
+		pass
+
 	# ✅ also remove from keep map if present
 	data = load_keep()
 	try:
@@ -3153,13 +3404,51 @@ def delete_file(library, filename):
 	return redirect(url_for("index") + f"?tab={tab}")
 
 
+_EMBED_POOL_SIZE = 64
+
+# Module-level session: keep-alive connections survive between downloads, so
+# repeat embeds skip the TCP+TLS handshake per image. urllib3's pool is
+# thread-safe, so the fetch threadpool below can share it.
+_EMBED_SESSION = requests.Session()
+_EMBED_ADAPTER = HTTPAdapter(pool_connections=_EMBED_POOL_SIZE, pool_maxsize=_EMBED_POOL_SIZE, max_retries=1)
+_EMBED_SESSION.mount("http://", _EMBED_ADAPTER)
+_EMBED_SESSION.mount("https://", _EMBED_ADAPTER)
+
+# Precompiled bytes-mode patterns: the HTML never has to be decoded to str
+# just to run the regexes over it.
+_IMG_TAG_RE = re.compile(rb'<img\b[^>]*\bsrc="([^"]+)"[^>]*>', re.IGNORECASE)
+_IMG_ATTR_RES = {
+	"id": re.compile(rb'id="([^"]*)"', re.IGNORECASE),
+	"class": re.compile(rb'class="([^"]*)"', re.IGNORECASE),
+	"alt": re.compile(rb'alt="([^"]*)"', re.IGNORECASE),
+	"loading": re.compile(rb'loading="([^"]*)"', re.IGNORECASE),
+	"style": re.compile(rb'style="([^"]*)"', re.IGNORECASE),
+}
+
+
 @app.route("/download/<library>/<filename>")
 def download_embedded(library, filename):
 	file_path = os.path.join(BASE_OUTPUT_DIR, library, filename)
 	if not os.path.exists(file_path):
 		return "File not found", 404
 
-	with open(file_path, "r", encoding="utf-8") as f:
+	# The embedded artifact is cached on disk keyed by the source's mtime, so
+	# repeat downloads are a plain sendfile instead of re-fetching every image.
+	emb_dir = os.path.join(BASE_OUTPUT_DIR, library, ".embedded")
+	emb_path = os.path.join(emb_dir, filename)
+	try:
+		if os.path.getmtime(emb_path) >= os.path.getmtime(file_path):
+			return send_from_directory(
+				emb_dir,
+				filename,
+				mimetype="text/html",
+				as_attachment=True,
+				download_name=filename,
+			)
+	except OSError:
+		pass
+
+	with open(file_path, "rb") as f:
 		html = f.read()
 	try:
 		conn = _fresh_conn()
@@ -3167,18 +3456,44 @@ def download_embedded(library, filename):
 	except Exception:
 		jellytag_bypass = False
 
+	# Fetch every referenced image concurrently over the shared session, so
+	# the substitution pass below never blocks on the network. Latency drops
+	# from the sum of per-image round trips to roughly the slowest one.
+	def _fetch(u):
+		try:
+			resp = _EMBED_SESSION.get(u, timeout=30)
+			resp.raise_for_status()
+			return resp
+		except Exception as e:
+			app.logger.error(f"Failed to embed image {u}: {e}")
+			return None
+
+	srcs = _IMG_TAG_RE.findall(html)
+	fetch_urls = []
+	for src in srcs:
+		url = generate_add_jellytag_bypass(src.decode("utf-8", "replace"), jellytag_bypass)
+		if not url.startswith("data:") and url not in fetch_urls:
+			fetch_urls.append(url)
+
+	if fetch_urls:
+		with ThreadPoolExecutor(max_workers=min(_EMBED_POOL_SIZE, len(fetch_urls))) as ex:
+			fetched = dict(zip(fetch_urls, ex.map(_fetch, fetch_urls)))
+	else:
+		fetched = {}
+
 	def embed_img(match):
 		full_tag = match.group(0)
-		url = generate_add_jellytag_bypass(match.group(1), jellytag_bypass)
+		url = generate_add_jellytag_bypass(match.group(1).decode("utf-8", "replace"), jellytag_bypass)
 
 		try:
 			# Leave already-embedded images alone
 			if url.startswith("data:"):
 				return full_tag
 
-			resp = requests.get(url, timeout=30)
-			resp.raise_for_status()
-			img_data = base64.b64encode(resp.content).decode("utf-8")
+			resp = fetched.get(url)
+			if resp is None:
+				return full_tag
+			img_data = base64.b64encode(resp.content)
 
 			content_type = (resp.headers.get("Content-Type") or "").lower()
 			if "jpeg" in content_type or "jpg" in content_type:
@@ -3210,37 +3525,47 @@ def download_embedded(library, filename):
 			# This avoids leaving behind broken attribute text when stripping lightbox behavior.
 			attrs = []
 
-			alt_match = re.search(r'alt="([^"]*)"', full_tag, flags=re.IGNORECASE)
-			class_match = re.search(r'class="([^"]*)"', full_tag, flags=re.IGNORECASE)
-			loading_match = re.search(r'loading="([^"]*)"', full_tag, flags=re.IGNORECASE)
-			style_match = re.search(r'style="([^"]*)"', full_tag, flags=re.IGNORECASE)
-			id_match = re.search(r'id="([^"]*)"', full_tag, flags=re.IGNORECASE)
+			id_match = _IMG_ATTR_RES["id"].search(full_tag)
+			class_match = _IMG_ATTR_RES["class"].search(full_tag)
+			alt_match = _IMG_ATTR_RES["alt"].search(full_tag)
+			loading_match = _IMG_ATTR_RES["loading"].search(full_tag)
+			style_match = _IMG_ATTR_RES["style"].search(full_tag)
 
 			if id_match:
-				attrs.append(f'id="{id_match.group(1)}"')
-			attrs.append(f'src="data:{mime};base64,{img_data}"')
+				attrs.append(b'id="' + id_match.group(1) + b'"')
+			attrs.append(b'src="data:' + mime.encode("ascii") + b";base64," + img_data + b'"')
 			if class_match:
-				attrs.append(f'class="{class_match.group(1)}"')
+				attrs.append(b'class="' + class_match.group(1) + b'"')
 			if alt_match:
-				attrs.append(f'alt="{alt_match.group(1)}"')
+				attrs.append(b'alt="' + alt_match.group(1) + b'"')
 			if loading_match:
-				attrs.append(f'loading="{loading_match.group(1)}"')
+				attrs.append(b'loading="' + loading_match.group(1) + b'"')
 			if style_match:
-				attrs.append(f'style="{style_match.group(1)}"')
+				attrs.append(b'style="' + style_match.group(1) + b'"')
 
-			self_closing = full_tag.rstrip().endswith("/>")
-			return f"<img {' '.join(attrs)}{' /' if self_closing else ''}>"
+			self_closing = full_tag.rstrip().endswith(b"/>")
+			return b"<img " + b" ".join(attrs) + (b" /" if self_closing else b"") + b">"
 
 		except Exception as e:
 			app.logger.error(f"Failed to embed image {url}: {e}")
 			return full_tag
 
-	html_embedded = re.sub(
-		r'<img\b[^>]*\bsrc="([^"]+)"[^>]*>',
-		embed_img,
-		html,
-		flags=re.IGNORECASE,
-	)
+	html_embedded = _IMG_TAG_RE.sub(embed_img, html)
+
+	# Only cache a fully embedded result. If any image fetch failed, the
+	# output still carries remote <img> tags; pinning it to disk would serve
+	# the degraded copy on every later download instead of retrying.
+	if all(resp is not None for resp in fetched.values()):
+		try:
+			os.makedirs(emb_dir, exist_ok=True)
+			tmp_path = emb_path + ".tmp"
+			with open(tmp_path, "wb") as f:
+				f.write(html_embedded)
+			os.replace(tmp_path, emb_path)
+		except OSError as e:
+			app.logger.warning(f"Could not cache embedded HTML for {library}/{filename}: {e}")
+	else:
+		app.logger.warning(f"Not caching embedded HTML for {library}/{filename}: some image fetches failed")
 
 	return Response(
 		html_embedded,
@@ -3251,7 +3576,11 @@ def download_embedded(library, filename):
 
 @app.route("/assets/<filename>")
 def serve_assets(filename):
-	return send_from_directory(ASSETS_DIR, filename)
+	# Assets are content-stable (logo/favicon), so let browsers cache them
+	# for good instead of re-downloading the payload with every page.
+	resp = send_from_directory(ASSETS_DIR, filename)
+	resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+	return resp
 
 
 # start scheduler thread once
@@ -3297,4 +3626,6 @@ def _ensure_background_tasks_started():
 
 if __name__ == "__main__":
 	_ensure_scheduler_started()
-	app.run(host="0.0.0.0", port=1280)
+	# Dev-server fallback only; Docker runs gunicorn (see Dockerfile).
+	# threaded=True keeps a streamed build from blocking every other request.
+	app.run(host="0.0.0.0", port=1280, threaded=True)